@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+'''
+Measures how long a fresh interpreter takes to import the pycococreatortools
+modules, compared to the eager imports pycococreatortools.pycococreatortools
+used to do (numpy, skimage.measure, PIL.Image and pycocotools.mask).
+
+usage: import_time.py [--runs N]
+
+Every measurement starts a new python process, so nothing is served from
+sys.modules. The median of N runs is reported.
+'''
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('python startup', 'pass'),
+    ('eager deps (before)', 'import numpy, skimage.measure, PIL.Image, pycocotools.mask'),
+    ('pycococreatortools', 'import pycococreatortools.pycococreatortools'),
+    ('pycococreator cli', 'import pycococreatortools.cli'),
+]
+
+def time_import(statement, runs):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20, help='Runs per case (default: %(default)s)')
+    args = parser.parse_args()
+
+    startup = None
+    for name, statement in CASES:
+        seconds = time_import(statement, args.runs)
+        if startup is None:
+            startup = seconds
+        print("%-22s %7.1f ms  (+%.1f ms over startup)" % (name, seconds * 1000, (seconds - startup) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,6 @@ import os
 import argparse
 import json
 from shutil import copyfile
-import urllib.request
 
 def coco_image_copy(args):
 	src_img_dir = args.image_in_dir
@@ -42,6 +41,9 @@ def coco_image_copy(args):
 
 
 def coco_image_download(args):
+	# Imported here so 'copy' doesn't pay for loading http/ssl
+	import urllib.request
+
 	dst_img_dir = args.image_out_dir
 
 	if not os.path.exists(dst_img_dir):
@@ -62,20 +64,28 @@ def coco_image_download(args):
 		urllib.request.urlretrieve(img['coco_url'], dst_img_fname)
 
 
+def add_copy_arguments(parser):
+	parser.add_argument('in_json_filename', type=str, help='Input COCO json file')
+	parser.add_argument('image_in_dir', type=str, help='Input image directory')
+	parser.add_argument('image_out_dir', type=str, help='Output image directory')
+	parser.set_defaults(func=coco_image_copy)
+
+
+def add_download_arguments(parser):
+	parser.add_argument('in_json_filename', type=str, help='Input COCO json file')
+	parser.add_argument('image_out_dir', type=str, help='Output image directory')
+	parser.set_defaults(func=coco_image_download)
+
+
 def main():
 	parser = argparse.ArgumentParser()
 	subparsers = parser.add_subparsers()
 	
 	parser_copy = subparsers.add_parser('copy')
-	parser_copy.add_argument('in_json_filename', type=str, help='Input COCO json file')
-	parser_copy.add_argument('image_in_dir', type=str, help='Input image directory')
-	parser_copy.add_argument('image_out_dir', type=str, help='Output image directory')
-	parser_copy.set_defaults(func=coco_image_copy)
+	add_copy_arguments(parser_copy)
 	
 	parser_download = subparsers.add_parser('download')
-	parser_download.add_argument('in_json_filename', type=str, help='Input COCO json file')
-	parser_download.add_argument('image_out_dir', type=str, help='Output image directory')
-	parser_download.set_defaults(func=coco_image_download)
+	add_download_arguments(parser_download)
 
 	args = parser.parse_args()
 	args.func(args)
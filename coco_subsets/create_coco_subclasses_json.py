@@ -7,81 +7,152 @@ and create a new json file that contains a subset of the original classes.
 usage: create_coco_subclasses_json.py <input COCO json> <output COCO json> [classes]
 ex: create_coco_subclasses_json.py instances_val2017.json person_car_subset_val2017.json person car
 
+Many subsets can be cut from the same input in a single pass with a spec file
+mapping each output file to its classes (JSON, or YAML if PyYAML is installed):
+
+usage: create_coco_subclasses_json.py <input COCO json> --spec <spec json/yaml>
+ex: create_coco_subclasses_json.py instances_val2017.json --spec subsets.json
+    subsets.json: {"person_car_val2017.json": ["person", "car"], "dog_val2017.json": ["dog"]}
+
 '''
 
 import sys
+import os
 import argparse
 import json
 
 
-def create_coco_subset_json(args):
-	category_subset_names = args.classes
-	# subset of categorys
-	category_subset = [] # json objects
-	# ids for each category
-	category_ids = [] # list of integers
-	# subset of annotations
-	annotation_subset = [] # json objects
-	# subset of image ids found in annotation_subset
+def load_subset_spec(spec_filename):
+	'''
+	Read a subset spec: a mapping of output COCO json file -> list of classes.
+	JSON is always supported, YAML (.yaml/.yml) needs PyYAML installed.
+	Relative output paths are taken relative to the spec file.
+	'''
+	with open(spec_filename, "r") as infile:
+		if os.path.splitext(spec_filename)[1].lower() in ('.yaml', '.yml'):
+			try:
+				import yaml
+			except ImportError:
+				sys.exit("Error. PyYAML is required to read '%s'" % spec_filename)
+			spec = yaml.safe_load(infile)
+		else:
+			spec = json.load(infile)
+
+	if not isinstance(spec, dict) or not spec:
+		sys.exit("Error. '%s' must map output json files to lists of classes" % spec_filename)
+
+	spec_dir = os.path.dirname(spec_filename)
+	subsets = []
+	for out_json_filename, classes in spec.items():
+		if isinstance(classes, str):
+			classes = [classes]
+		if not isinstance(classes, list) or not classes:
+			sys.exit("Error. '%s' in '%s' needs a non-empty list of classes, got %r" % \
+				(out_json_filename, spec_filename, classes))
+		for cat_name in classes:
+			if not isinstance(cat_name, str):
+				sys.exit("Error. '%s' in '%s' has a class that isn't a name: %r" % \
+					(out_json_filename, spec_filename, cat_name))
+		subsets.append((os.path.join(spec_dir, out_json_filename), classes))
+
+	return subsets
+
+
+def create_coco_subsets(json_data, subsets):
+	'''
+	Split json_data into one COCO json object per (out_json_filename, classes)
+	entry in subsets. Annotations and images are each scanned once, and routed
+	to every output that wants them.
+	'''
+	categories = json_data['categories']
+
+	# First check that all class parameters are valid
+	subsets = [(out, [cat.lower() for cat in classes]) for out, classes in subsets]
+	category_names = set(cat['name'] for cat in categories)
+	for _, category_subset_names in subsets:
+		for cat_name in category_subset_names:
+			if cat_name not in category_names:
+				sys.exit("Error. '%s' class not found" % cat_name)
+
+	# subset of categories for each output
+	category_subsets = [[] for _ in subsets] # json objects
+	# output indices wanting each category id
+	outputs_by_category_id = {} # int -> list of integers
+	for cat in categories:
+		for i, (_, category_subset_names) in enumerate(subsets):
+			if cat['name'] in category_subset_names:
+				category_subsets[i].append(cat)
+				outputs_by_category_id.setdefault(cat['id'], []).append(i)
+
+	# Now route the annotations that are associated with those classes
+	annotation_subsets = [[] for _ in subsets] # json objects
 	# Note we don't need multiple instances of the same image
-	img_ids = set() # set of integers
-	# subset of images
-	images_subset = [] # json objects
+	outputs_by_image_id = {} # int -> set of integers
+	for ann in json_data['annotations']:
+		for i in outputs_by_category_id.get(ann['category_id'], ()):
+			annotation_subsets[i].append(ann)
+			outputs_by_image_id.setdefault(ann['image_id'], set()).add(i)
+
+	# Now route each image that had a matching annotation
+	images_subsets = [[] for _ in subsets] # json objects
+	for img in json_data['images']:
+		for i in outputs_by_image_id.get(img['id'], ()):
+			images_subsets[i].append(img)
+
+	# Re-use our existing json object and just replace with our subsets
+	outputs = []
+	for i in range(len(subsets)):
+		subset_json_data = dict(json_data)
+		subset_json_data['images'] = images_subsets[i]
+		subset_json_data['annotations'] = annotation_subsets[i]
+		subset_json_data['categories'] = category_subsets[i]
+		outputs.append(subset_json_data)
+
+	return outputs
+
 
-	# Parse json file
+def create_coco_subset_json(args):
+	if args.spec is not None:
+		subsets = load_subset_spec(args.spec)
+	else:
+		subsets = [(args.out_json_filename, args.classes)]
+
+	# Parse json file, once for every subset
 	with open(args.in_json_filename, "r") as infile:
 		json_data = json.load(infile)
 
-	images = json_data['images']
-	annotations = json_data['annotations']
-	categories = json_data['categories']
+	outputs = create_coco_subsets(json_data, subsets)
+
+	for (out_json_filename, _), subset_json_data in zip(subsets, outputs):
+		with open(out_json_filename, 'w') as outfile:
+			# Add separators if you want to actually look at the file
+			#json.dump(subset_json_data, outfile, indent=2, separators=(',', ': '))
+			json.dump(subset_json_data, outfile)
 
-	# First check that all class parameters are valid
-	category_subset_names = [cat.lower() for cat in category_subset_names]
-	for cat_name in category_subset_names:
-		found_match = False
-		for cat in categories:
-			if cat['name'] == cat_name:
-				found_match = True
-		if not found_match:
-			sys.exit("Error. '%s' class not found" % cat_name)
-
-	# First get the subset of categories that we want
-	for cat in categories:
-		if cat['name'] in category_subset_names:
-			category_subset.append(cat)
-			category_ids.append(cat['id'])
 
-	# Now find the annotations that are associated with those classes
-	for ann in annotations:
-		if ann['category_id'] in category_ids:
-			annotation_subset.append(ann)
-			img_ids.add(ann['image_id'])
+def add_arguments(parser):
+	parser.add_argument('in_json_filename', type=str, help='Input COCO json file')
+	parser.add_argument('out_json_filename', nargs='?', type=str, help='Output COCO json file')
+	parser.add_argument('classes', nargs='*', type=str, help='List of COCO classes you want to extract')
+	parser.add_argument('--spec', type=str, default=None, \
+		help='JSON/YAML file mapping output COCO json files to class lists, all written in one pass')
 
-	# Now find each image that had a matching annotation
-	for img in images:
-		if img['id'] in img_ids:
-			images_subset.append(img)
+	parser.set_defaults(func=create_coco_subset_json)
 
-	# Re-use our existing json object and just replace with our subsets
-	json_data['images'] = images_subset
-	json_data['annotations'] = annotation_subset
-	json_data['categories'] = category_subset
 
-	with open(args.out_json_filename, 'w') as outfile:
-		# Add separators if you want to actually look at the file
-		#json.dump(json_data, outfile, indent=2, separators=(',', ': '))
-		json.dump(json_data, outfile)
+# Checks argparse can't express: either --spec, or an output file and classes
+def check_arguments(parser, args):
+	if args.spec is not None and args.out_json_filename is not None:
+		parser.error("--spec can't be combined with out_json_filename and classes")
+	if args.spec is None and not args.classes:
+		parser.error("out_json_filename and classes are required without --spec")
 
 
 def main():
 	parser = argparse.ArgumentParser()
-	parser.add_argument('in_json_filename', type=str, help='Input COCO json file')
-	parser.add_argument('out_json_filename', type=str, help='Output COCO json file')
-	parser.add_argument('classes', nargs='+', type=str, help='List of COCO classes you want to extract')
-
-	parser.set_defaults(func=create_coco_subset_json)
+	add_arguments(parser)
 	args = parser.parse_args()
+	check_arguments(parser, args)
 	args.func(args)
 
 
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import io
 import datetime
 import json
 import os
@@ -8,6 +9,7 @@ import fnmatch
 from PIL import Image
 import numpy as np
 from pycococreatortools import pycococreatortools
+from pycococreatortools import pipeline
 
 ROOT_DIR = 'train'
 IMAGE_DIR = os.path.join(ROOT_DIR, "shapes_train2018")
@@ -67,6 +69,42 @@ def filter_for_annotations(root, files, image_filename):
 
     return files
 
+# Pipeline read stage: image header and raw mask bytes for a single image
+def read_image_job(image_filename):
+    # Only the header is read here, the pixel data is never decoded
+    with Image.open(image_filename) as image:
+        image_size = image.size
+
+    # filter for associated png annotations
+    masks = []
+    for root, _, files in os.walk(ANNOTATION_DIR):
+        for annotation_filename in filter_for_annotations(root, files, image_filename):
+            with open(annotation_filename, 'rb') as mask_file:
+                masks.append((annotation_filename, mask_file.read()))
+
+    return image_filename, image_size, masks
+
+# Pipeline annotate stage: decode masks and trace their contours
+# Annotation and image ids are assigned by the (ordered) write stage
+def annotate_image_job(loaded_job):
+    image_filename, image_size, masks = loaded_job
+
+    annotations = []
+    for annotation_filename, mask_bytes in masks:
+        class_id = [x['id'] for x in CATEGORIES if x['name'] in annotation_filename][0]
+
+        category_info = {'id': class_id, 'is_crowd': 'crowd' in image_filename}
+        binary_mask = np.asarray(Image.open(io.BytesIO(mask_bytes))
+            .convert('1')).astype(np.uint8)
+
+        annotation_info = pycococreatortools.create_annotation_info(
+            None, None, category_info, binary_mask,
+            image_size, tolerance=2)
+
+        annotations.append((annotation_filename, annotation_info))
+
+    return image_filename, image_size, annotations
+
 def main():
 
     coco_output = {
@@ -81,40 +119,30 @@ def main():
     segmentation_id = 1
     
     # filter for jpeg images
+    image_files = []
     for root, _, files in os.walk(IMAGE_DIR):
-        image_files = filter_for_jpeg(root, files)
-
-        # go through each image
-        for image_filename in image_files:
-            image = Image.open(image_filename)
-            image_info = pycococreatortools.create_image_info(
-                image_id, os.path.basename(image_filename), image.size)
-            coco_output["images"].append(image_info)
-
-            # filter for associated png annotations
-            for root, _, files in os.walk(ANNOTATION_DIR):
-                annotation_files = filter_for_annotations(root, files, image_filename)
-
-                # go through each associated annotation
-                for annotation_filename in annotation_files:
-                    
-                    print(annotation_filename)
-                    class_id = [x['id'] for x in CATEGORIES if x['name'] in annotation_filename][0]
-
-                    category_info = {'id': class_id, 'is_crowd': 'crowd' in image_filename}
-                    binary_mask = np.asarray(Image.open(annotation_filename)
-                        .convert('1')).astype(np.uint8)
-                    
-                    annotation_info = pycococreatortools.create_annotation_info(
-                        segmentation_id, image_id, category_info, binary_mask,
-                        image.size, tolerance=2)
-
-                    if annotation_info is not None:
-                        coco_output["annotations"].append(annotation_info)
-
-                    segmentation_id = segmentation_id + 1
-
-            image_id = image_id + 1
+        image_files += filter_for_jpeg(root, files)
+
+    # go through each image, disk reads overlap with mask processing
+    results = pipeline.run_pipeline(image_files, read_image_job, annotate_image_job)
+    for image_filename, image_size, annotations in results:
+        image_info = pycococreatortools.create_image_info(
+            image_id, os.path.basename(image_filename), image_size)
+        coco_output["images"].append(image_info)
+
+        # go through each associated annotation
+        for annotation_filename, annotation_info in annotations:
+
+            print(annotation_filename)
+
+            if annotation_info is not None:
+                annotation_info['id'] = segmentation_id
+                annotation_info['image_id'] = image_id
+                coco_output["annotations"].append(annotation_info)
+
+            segmentation_id = segmentation_id + 1
+
+        image_id = image_id + 1
 
     with open('{}/instances_shape_train2018.json'.format(ROOT_DIR), 'w') as output_json_file:
         json.dump(coco_output, output_json_file)
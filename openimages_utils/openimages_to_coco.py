@@ -24,6 +24,7 @@ I started at 92 because COCO defines up to 91.
 '''
 
 import sys
+import io
 import datetime
 import json
 import os
@@ -34,6 +35,7 @@ import random
 from PIL import Image
 import numpy as np
 from pycococreatortools import pycococreatortools
+from pycococreatortools import pipeline
 from copy import deepcopy
 
 # Train, val, test split
@@ -97,6 +99,41 @@ def train_val_test_split(file_list):
     train_imgs, val_imgs, test_imgs = np.split(file_list, (train_split, val_split))
     return (train_imgs, val_imgs, test_imgs)
 
+# Pipeline read stage: image header and raw mask bytes for a single image
+def read_image_job(job):
+    image_filename = job['image_filename']
+    # Only the header is read here, the pixel data is never decoded
+    with Image.open(image_filename) as image:
+        image_size = image.size
+
+    # Filter for associated png annotations
+    annotation_files = []
+    for root, _, files in os.walk(os.path.join(job['mask_dir'], job['class_name'])):
+        annotation_files += filter_for_annotations(root, files, image_filename)
+
+    masks = []
+    for annotation_filename in annotation_files:
+        with open(annotation_filename, 'rb') as mask_file:
+            masks.append(mask_file.read())
+
+    return dict(job, image_size=image_size, masks=masks)
+
+# Pipeline annotate stage: decode masks and trace their contours
+# Annotation and image ids are assigned by the (ordered) write stage
+def annotate_image_job(job):
+    category_info = {'id': job['class_id'], 'is_crowd': 'crowd' in job['image_filename']}
+
+    annotations = []
+    for mask_bytes in job['masks']:
+        binary_mask = np.asarray(Image.open(io.BytesIO(mask_bytes))
+            .convert('1')).astype(np.uint8)
+
+        # 0 tolerance for maximum accuracy
+        annotations.append(pycococreatortools.create_annotation_info(
+            None, None, category_info, binary_mask, job['image_size'], tolerance=0))
+
+    return dict(job, masks=None, annotations=annotations)
+
 def oi_to_coco(args):
     image_dir = args.image_dir
     mask_dir = args.mask_dir
@@ -120,7 +157,8 @@ def oi_to_coco(args):
     # Keep track of files with missing annotations
     missing_annotation_files = []
 
-    # Process each category/class
+    # Build the list of images to process for each category/class
+    jobs = []
     for category in CATEGORIES:
         class_id = category['id']
         class_name = category['name']
@@ -137,48 +175,46 @@ def oi_to_coco(args):
 
             # For each subset of images
             for i, image_files in enumerate([train_imgs, val_imgs, test_imgs]):
-                coco_output = coco_outputs[i]
-
-                # For each jpg image
                 for image_filename in image_files:
-                    print("Processing %s" % image_filename)
-                    image = Image.open(image_filename)
-
-                    # Filter for associated png annotations
-                    for root, _, files in os.walk(os.path.join(mask_dir, class_name)):
-                        annotation_files = filter_for_annotations(root, files, image_filename)
-                        if len(annotation_files) == 0:
-                            #print("Missing annotation for %s" % image_filename)
-                            missing_annotation_files.append(image_filename)
-
-                        # For each associated annotation
-                        for annotation_filename in annotation_files:
-                            #print(annotation_filename)
-
-                            category_info = {'id': class_id, 'is_crowd': 'crowd' in image_filename}
-                            binary_mask = np.asarray(Image.open(annotation_filename)
-                                .convert('1')).astype(np.uint8)
-
-                            # 0 tolerance for maximum accuracy
-                            annotation_info = pycococreatortools.create_annotation_info(
-                                segmentation_ids[i], image_ids[i], category_info, binary_mask,
-                                image.size, tolerance=0)
-
-                            if annotation_info is not None:
-                                coco_output["annotations"].append(annotation_info)
-
-                            segmentation_ids[i] += 1
-
-                    '''
-                    Quirk here - Using oi_download_dataset to download images puts them in
-                    a sub dir called images. This is because there's another one next to
-                    it with the pascal or darknet annotations (which we're not using)
-                    '''
-                    image_path = os.path.join(class_name, 'images', os.path.basename(image_filename))
-                    image_info = pycococreatortools.create_image_info(image_ids[i], image_path, image.size)
-                    coco_output["images"].append(image_info)
-
-                    image_ids[i] += 1
+                    jobs.append({
+                        'split': i,
+                        'image_filename': str(image_filename),
+                        'class_id': class_id,
+                        'class_name': class_name,
+                        'mask_dir': mask_dir,
+                    })
+
+    # Reads and mask processing overlap, results come back in job order
+    results = pipeline.run_pipeline(jobs, read_image_job, annotate_image_job,
+        **pipeline.pipeline_kwargs(args))
+
+    for job in results:
+        i = job['split']
+        coco_output = coco_outputs[i]
+        print("Processing %s" % job['image_filename'])
+
+        if len(job['annotations']) == 0:
+            #print("Missing annotation for %s" % job['image_filename'])
+            missing_annotation_files.append(job['image_filename'])
+
+        for annotation_info in job['annotations']:
+            if annotation_info is not None:
+                annotation_info['id'] = segmentation_ids[i]
+                annotation_info['image_id'] = image_ids[i]
+                coco_output["annotations"].append(annotation_info)
+
+            segmentation_ids[i] += 1
+
+        '''
+        Quirk here - Using oi_download_dataset to download images puts them in
+        a sub dir called images. This is because there's another one next to
+        it with the pascal or darknet annotations (which we're not using)
+        '''
+        image_path = os.path.join(job['class_name'], 'images', os.path.basename(job['image_filename']))
+        image_info = pycococreatortools.create_image_info(image_ids[i], image_path, job['image_size'])
+        coco_output["images"].append(image_info)
+
+        image_ids[i] += 1
 
     if len(missing_annotation_files) != 0:
         print("Warning. Missing annotations for %i files: " % len(missing_annotation_files))
@@ -205,6 +241,7 @@ def main():
     parser.add_argument('mask_dir', metavar='mask_dir', type=str, help='Masks directory')
     parser.add_argument('out_json_filename', metavar='out_json_filename', type=str, \
         help='output json filename (with or without .json)')
+    pipeline.add_pipeline_arguments(parser)
     parser.set_defaults(func=oi_to_coco)
 
     args = parser.parse_args()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+'''
+Single entry point for the dataset tools in this repo.
+
+usage: pycococreator convert <image dir> <mask dir> <output COCO json>
+usage: pycococreator subset <input COCO json> <output COCO json> [classes]
+usage: pycococreator subset <input COCO json> --spec <spec json/yaml>
+usage: pycococreator copy <input COCO json> <image dir in> <image dir out>
+usage: pycococreator download <input COCO json> <image dir out>
+usage: pycococreator sort <class-descriptions.csv> <input dir> <output dir>
+
+Only argparse and the stdlib-only tools are imported up front. convert and
+sort import their tool (and numpy, PIL, skimage, etc.) when they run, so
+quick jobs like subset and copy never pay for the mask processing
+dependencies.
+'''
+
+import argparse
+from pycococreatortools import pipeline
+# Light tools (stdlib only), their parsers are shared with the scripts
+from coco_subsets import create_coco_subclasses_json
+from coco_subsets import coco_image_subset
+
+
+def convert(args):
+    from openimages_utils import openimages_to_coco
+    openimages_to_coco.oi_to_coco(args)
+
+
+def sort(args):
+    from openimages_utils import sort_openimages_annotations
+    sort_openimages_annotations.sort_classes(args.class_descriptions_fn, args.input_dir, args.output_dir)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pycococreator')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    parser_convert = subparsers.add_parser('convert', help='Google Open Images masks -> COCO json')
+    parser_convert.add_argument('image_dir', type=str, help='Images directory')
+    parser_convert.add_argument('mask_dir', type=str, help='Masks directory')
+    parser_convert.add_argument('out_json_filename', type=str, \
+        help='output json filename (with or without .json)')
+    pipeline.add_pipeline_arguments(parser_convert)
+    parser_convert.set_defaults(func=convert)
+
+    parser_subset = subparsers.add_parser('subset', help='Extract class subsets of a COCO json')
+    create_coco_subclasses_json.add_arguments(parser_subset)
+
+    parser_copy = subparsers.add_parser('copy', help='Copy the images of a COCO json')
+    coco_image_subset.add_copy_arguments(parser_copy)
+
+    parser_download = subparsers.add_parser('download', help='Download the images of a COCO json')
+    coco_image_subset.add_download_arguments(parser_download)
+
+    parser_sort = subparsers.add_parser('sort', help='Sort Open Images masks into class directories')
+    parser_sort.add_argument('class_descriptions_fn', type=str, help='class-descriptions.csv')
+    parser_sort.add_argument('input_dir', type=str, help='Directory of downloaded masks')
+    parser_sort.add_argument('output_dir', type=str, help='Output directory, one sub directory per class')
+    parser_sort.set_defaults(func=sort)
+
+    return parser, parser_subset
+
+
+def main(argv=None):
+    parser, parser_subset = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'subset':
+        create_coco_subclasses_json.check_arguments(parser_subset, args)
+
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
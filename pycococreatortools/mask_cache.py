@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+'''
+On disk cache of decoded, resized and bit-packed binary masks.
+
+Running create_annotation_info over the same masks many times (for example
+sweeping `tolerance`) normally re-decodes every PNG and redoes
+resize_binary_mask each time. MaskCache does that work once per
+(mask file, target size) and keeps the result as a bit-packed .npy file,
+which later runs read back memory-mapped straight from the page cache.
+
+ex:
+    cache = MaskCache('/tmp/mask_cache')
+    binary_mask = cache.get(annotation_filename, image.size)
+    polygons_per_tolerance = pycococreatortools.binary_mask_to_polygons(
+        binary_mask, [0, 1, 2, 4])
+'''
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+from pycococreatortools import pycococreatortools
+
+class MaskCache(object):
+    """Cache of binary masks keyed by mask path and target size
+
+    Args:
+        cache_dir: directory holding the cache entries, created if missing
+
+    Entries are keyed on the absolute mask path, its modification time and
+    file size, so editing a mask invalidates its entry. Entries are written
+    to a unique temp file and renamed into place, so several threads or
+    processes can share one cache_dir.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, mask_path, image_size):
+        stat = os.stat(mask_path)
+        key = '%s|%d|%d|%dx%d' % (os.path.abspath(mask_path), stat.st_mtime_ns,
+            stat.st_size, image_size[0], image_size[1])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npy')
+
+    def get_packed(self, mask_path, image_size=None):
+        """Returns the mask bit-packed along rows, memory-mapped read only
+
+        Args:
+            mask_path: path to the mask image
+            image_size: (width, height) to resize the mask to. If None the
+                mask is kept at its own size.
+
+        Returns:
+            (packed_mask, width) where packed_mask is a uint8 array of shape
+            (height, ceil(width / 8))
+
+        """
+        if image_size is None:
+            from PIL import Image
+            # Only the header is read to find the size
+            with Image.open(mask_path) as mask_image:
+                image_size = mask_image.size
+        width = image_size[0]
+
+        entry_path = self._entry_path(mask_path, image_size)
+        if not os.path.exists(entry_path):
+            binary_mask = pycococreatortools.load_binary_mask(mask_path, image_size)
+            packed_mask = np.packbits(binary_mask, axis=1)
+            # Unique per writer, so threads missing on the same key never
+            # share (and truncate) a temp file
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(tmp_fd, 'wb') as entry_file:
+                    np.save(entry_file, packed_mask)
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        return np.load(entry_path, mmap_mode='r'), width
+
+    def get(self, mask_path, image_size=None):
+        """Returns the mask as a 2D boolean numpy array of shape (height, width)
+
+        Same as pycococreatortools.load_binary_mask(mask_path, image_size), so
+        the result can be passed to create_annotation_info with image_size=None.
+        """
+        packed_mask, width = self.get_packed(mask_path, image_size)
+        return np.unpackbits(packed_mask, axis=1, count=width).view(np.bool_)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+'''
+Small staged producer/consumer helpers used by the dataset conversion
+scripts to overlap disk reads with mask processing.
+
+A conversion is split into three stages:
+    read     - pull image headers and raw mask bytes off disk (I/O bound, threads)
+    annotate - decode masks and trace contours (CPU bound, processes)
+    write    - consume results in submission order (caller's thread)
+
+Every stage keeps at most `depth` items in flight, so a fast reader can
+never run arbitrarily far ahead of a slow annotator (backpressure), and
+results always come out in the same order the jobs went in.
+'''
+
+import os
+from collections import deque
+
+DEFAULT_READ_WORKERS = 8
+DEFAULT_READ_DEPTH = 32
+
+def ordered_map(executor, fn, iterable, depth):
+    """Lazily map fn over iterable on executor, yielding results in order
+
+    Args:
+        executor: a concurrent.futures executor to run fn on
+        fn: the function to apply to each item
+        iterable: input items, consumed lazily
+        depth: maximum number of submitted but not yet yielded items
+
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1, got %r" % depth)
+
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+
+    while pending:
+        yield pending.popleft().result()
+
+def run_pipeline(jobs, read_fn, annotate_fn,
+                 read_workers=DEFAULT_READ_WORKERS, read_depth=DEFAULT_READ_DEPTH,
+                 annotate_workers=None, annotate_depth=None):
+    """Run jobs through a read stage and an annotate stage, yielding in order
+
+    Args:
+        jobs: iterable of job descriptions passed to read_fn
+        read_fn: job -> loaded job, run on a thread pool. Should only do I/O.
+        annotate_fn: loaded job -> result, run on a process pool. Must be a
+            module level (picklable) function, and its module must be safe to
+            import in a fresh interpreter (guard scripts with __main__).
+        read_workers: number of reader threads
+        read_depth: maximum number of jobs read ahead of the annotate stage
+        annotate_workers: number of annotate processes. None uses os.cpu_count().
+            0 runs annotate_fn in the calling thread.
+        annotate_depth: maximum number of jobs queued on the annotate stage.
+            None uses 2 * annotate_workers, so every process has a job queued
+            behind the one it is working on.
+
+    The caller iterating over the returned generator is the write stage.
+    """
+    # Imported here, concurrent.futures pulls in multiprocessing and logging
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    if annotate_workers is None:
+        annotate_workers = os.cpu_count() or 1
+    if annotate_depth is None:
+        annotate_depth = 2 * max(annotate_workers, 1)
+
+    if annotate_workers == 0:
+        with ThreadPoolExecutor(max_workers=read_workers) as read_pool:
+            for loaded_job in ordered_map(read_pool, read_fn, jobs, read_depth):
+                yield annotate_fn(loaded_job)
+        return
+
+    # Never fork the annotate processes: reader threads may be holding locks
+    # (inside Image.open, file reads, ...) which a forked child would inherit
+    # held and deadlock on
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    mp_context = multiprocessing.get_context(start_method)
+
+    with ProcessPoolExecutor(max_workers=annotate_workers, mp_context=mp_context) as annotate_pool:
+        with ThreadPoolExecutor(max_workers=read_workers) as read_pool:
+            loaded = ordered_map(read_pool, read_fn, jobs, read_depth)
+            for result in ordered_map(annotate_pool, annotate_fn, loaded, annotate_depth):
+                yield result
+
+def add_pipeline_arguments(parser):
+    """Add the pipeline queue depth / worker options to an argparse parser"""
+    group = parser.add_argument_group('pipeline')
+    group.add_argument('--read-workers', type=int, default=DEFAULT_READ_WORKERS,
+        help='Number of threads reading images and masks from disk (default: %(default)s)')
+    group.add_argument('--read-depth', type=int, default=DEFAULT_READ_DEPTH,
+        help='Maximum number of images read ahead of processing (default: %(default)s)')
+    group.add_argument('--annotate-workers', type=int, default=None,
+        help='Number of processes tracing mask contours, 0 to run inline (default: cpu count)')
+    group.add_argument('--annotate-depth', type=int, default=None,
+        help='Maximum number of images queued for processing (default: 2 * annotate workers)')
+    return group
+
+def pipeline_kwargs(args):
+    """Pull the options added by add_pipeline_arguments out of parsed args"""
+    return {
+        'read_workers': args.read_workers,
+        'read_depth': args.read_depth,
+        'annotate_workers': args.annotate_workers,
+        'annotate_depth': args.annotate_depth,
+    }
@@ -5,14 +5,15 @@ import re
 import datetime
 import numpy as np
 from itertools import groupby
-from skimage import measure
-from PIL import Image
-from pycocotools import mask
+
+# skimage, PIL and pycocotools are imported inside the functions that need
+# them, so tools that only import this module for its helpers start quickly
 
 convert = lambda text: int(text) if text.isdigit() else text.lower()
 natrual_key = lambda key: [ convert(c) for c in re.split('([0-9]+)', key) ]
 
 def resize_binary_mask(array, new_size):
+    from PIL import Image
     image = Image.fromarray(array.astype(np.uint8)*255)
     image = image.resize(new_size)
     return np.asarray(image).astype(np.bool_)
@@ -32,20 +33,32 @@ def binary_mask_to_rle(binary_mask):
 
     return rle
 
-def binary_mask_to_polygon(binary_mask, tolerance=0):
-    """Converts a binary mask to COCO polygon representation
+def load_binary_mask(mask_path, image_size=None):
+    """Reads a mask image from disk as a 2D boolean numpy array
 
     Args:
-        binary_mask: a 2D binary numpy array where '1's represent the object
-        tolerance: Maximum distance from original points of polygon to approximated
-            polygonal chain. If tolerance is 0, the original coordinate array is returned.
+        mask_path: path to the mask image, non zero pixels are the object
+        image_size: optional (width, height) to resize the mask to
 
     """
-    polygons = []
+    from PIL import Image
+    binary_mask = np.asarray(Image.open(mask_path).convert('1')).astype(np.uint8)
+    if image_size is not None:
+        return resize_binary_mask(binary_mask, image_size)
+    return binary_mask.astype(np.bool_)
+
+def find_mask_contours(binary_mask):
+    """Traces the 0.5 level contours of a binary mask in mask coordinates"""
+    from skimage import measure
     # pad mask to close contours of shapes which start and end at an edge
     padded_binary_mask = np.pad(binary_mask, pad_width=1, mode='constant', constant_values=0)
     contours = measure.find_contours(padded_binary_mask, 0.5)
-    contours = np.subtract(contours, 1)
+    return [contour - 1 for contour in contours]
+
+def contours_to_polygon(contours, tolerance=0):
+    """Converts contours from find_mask_contours to COCO polygon representation"""
+    from skimage import measure
+    polygons = []
     for contour in contours:
         contour = close_contour(contour)
         contour = measure.approximate_polygon(contour, tolerance)
@@ -59,10 +72,42 @@ def binary_mask_to_polygon(binary_mask, tolerance=0):
 
     return polygons
 
+def binary_mask_to_polygon(binary_mask, tolerance=0):
+    """Converts a binary mask to COCO polygon representation
+
+    Args:
+        binary_mask: a 2D binary numpy array where '1's represent the object
+        tolerance: Maximum distance from original points of polygon to approximated
+            polygonal chain. If tolerance is 0, the original coordinate array is returned.
+
+    """
+    return contours_to_polygon(find_mask_contours(binary_mask), tolerance)
+
+def binary_mask_to_polygons(binary_mask, tolerances):
+    """Converts a binary mask to COCO polygon representation once per tolerance
+
+    The contours are only traced once and shared by every tolerance, which makes
+    tolerance sweeps much cheaper than repeated calls to binary_mask_to_polygon.
+
+    Args:
+        binary_mask: a 2D binary numpy array where '1's represent the object
+        tolerances: iterable of tolerances, see binary_mask_to_polygon
+
+    Returns:
+        a list with the polygons for each tolerance, in the same order
+
+    """
+    contours = find_mask_contours(binary_mask)
+    return [contours_to_polygon(contours, tolerance) for tolerance in tolerances]
+
 def create_image_info(image_id, file_name, image_size, 
-                      date_captured=datetime.datetime.utcnow().isoformat(' '),
+                      date_captured=None,
                       license_id=1, coco_url="", flickr_url=""):
 
+    # Evaluated per call, a default argument would be frozen at import time
+    if date_captured is None:
+        date_captured = datetime.datetime.utcnow().isoformat(' ')
+
     image_info = {
             "id": image_id,
             "file_name": file_name,
@@ -78,6 +123,7 @@ def create_image_info(image_id, file_name, image_size,
 
 def create_annotation_info(annotation_id, image_id, category_info, binary_mask, 
                            image_size=None, tolerance=2, bounding_box=None):
+    from pycocotools import mask
 
     if image_size is not None:
         binary_mask = resize_binary_mask(binary_mask, image_size)
@@ -1,10 +1,9 @@
-from distutils.core import setup
-from distutils.extension import Extension
+from setuptools import setup
 
 # To install library to Python site-packages run "python setup.py install"
 
 setup(name='pycococreatortools',
-    packages=['pycococreatortools'],
+    packages=['pycococreatortools', 'coco_subsets', 'openimages_utils'],
     package_dir = {'pycococreatortools': 'pycococreatortools'},
     version='0.2.0',
     description = 'Tools to create COCO datasets',
@@ -16,4 +15,9 @@ setup(name='pycococreatortools',
     install_requires=[
         'numpy', 'pillow', 'scikit-image'
     ],
+    entry_points={
+        'console_scripts': [
+            'pycococreator = pycococreatortools.cli:main',
+        ],
+    },
 )
@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from pycococreatortools import pycococreatortools
+from pycococreatortools.mask_cache import MaskCache
+
+
+def write_mask(path, size=(300, 200)):
+    binary_mask = np.zeros((size[1], size[0]), dtype=np.uint8)
+    binary_mask[20:150, 40:260] = 255
+    Image.fromarray(binary_mask).save(path)
+    return path
+
+
+def test_get_matches_load_binary_mask(tmp_path):
+    mask_path = write_mask(str(tmp_path / 'mask.png'))
+    cache = MaskCache(str(tmp_path / 'cache'))
+
+    for image_size in (None, (150, 100), (333, 77)):
+        expected = pycococreatortools.load_binary_mask(mask_path, image_size)
+        for _ in range(2):
+            binary_mask = cache.get(mask_path, image_size)
+            assert binary_mask.dtype == np.bool_
+            assert np.array_equal(binary_mask, expected)
+
+
+def test_concurrent_cold_gets_of_same_mask(tmp_path):
+    mask_path = write_mask(str(tmp_path / 'mask.png'), size=(1500, 1200))
+    cache_dir = str(tmp_path / 'cache')
+    cache = MaskCache(cache_dir)
+    expected = pycococreatortools.load_binary_mask(mask_path, (3000, 3000))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get, mask_path, (3000, 3000)) for _ in range(8)]
+        results = [future.result() for future in futures]
+
+    for binary_mask in results:
+        assert np.array_equal(binary_mask, expected)
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1
+    assert not any(entry.endswith('.tmp') for entry in entries)